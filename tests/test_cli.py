@@ -0,0 +1,141 @@
+"""Tests for the treeson command line interface."""
+
+import io
+import json
+import os
+import sys
+
+import pytest
+
+from treeson import cli
+
+
+def run(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["treeson", *args])
+    return cli.main()
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Create a small project and make it the current directory."""
+    for name in ("a.txt", "B.txt", "README.md", "ünï.txt", "src/main.py", ".env"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+STREAMED = [["--compact"], ["--ndjson"]]
+
+
+@pytest.mark.parametrize("options", STREAMED)
+def test_streamed_output_keeps_existing_file_on_error(
+    project, monkeypatch, options
+):
+    (project / "prev.json").write_text("hello")
+
+    assert run(monkeypatch, "nope", *options, "-o", "prev.json") == 1
+    assert (project / "prev.json").read_text() == "hello"
+    assert sorted(os.listdir(project)) == [
+        ".env", "B.txt", "README.md", "a.txt", "prev.json", "src", "ünï.txt"
+    ]
+
+
+@pytest.mark.parametrize("options", STREAMED)
+def test_streamed_output_leaves_no_partial_file(project, monkeypatch, options):
+    def failing_list_dir(dir_path, *args):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(cli, "_list_dir", failing_list_dir)
+    assert run(monkeypatch, ".", *options, "-o", "out.json") == 1
+    assert not any(name.endswith((".json", ".tmp")) for name in os.listdir(project))
+
+
+@pytest.mark.parametrize("hidden", [[], ["--include-hidden"]])
+def test_compact_output_does_not_list_itself(project, monkeypatch, hidden):
+    assert run(monkeypatch, ".", *hidden, "-o", "../pretty.json") == 0
+    assert run(monkeypatch, ".", "--compact", *hidden, "-o", "out.json") == 0
+
+    streamed = json.loads((project / "out.json").read_text(encoding="utf-8"))
+    built = json.loads((project.parent / "pretty.json").read_text(encoding="utf-8"))
+    assert streamed == built
+    assert "out.json" not in streamed["files"]
+
+
+@pytest.mark.parametrize("hidden", [[], ["--include-hidden"]])
+def test_ndjson_output_does_not_list_itself(project, monkeypatch, hidden):
+    assert run(monkeypatch, ".", "--ndjson", *hidden, "-o", "out.ndjson") == 0
+
+    lines = (project / "out.ndjson").read_text(encoding="utf-8").splitlines()
+    root = json.loads(lines[0])
+    assert root["path"] == "."
+    assert "out.ndjson" not in root["files"]
+    assert not any(name.endswith(".tmp") for name in root["files"])
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_stdout_receives_encoded_json(project, monkeypatch, capsysbinary, compact):
+    options = ["--compact"] if compact else []
+    assert run(monkeypatch, ".", *options) == 0
+
+    expected = cli._encode_json(cli.dir_to_json(project), compact)
+    assert capsysbinary.readouterr().out == expected + b"\n"
+
+
+def test_text_only_stdout_gets_the_same_document(project, monkeypatch):
+    stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stdout)
+    assert run(monkeypatch, ".") == 0
+
+    expected = cli._encode_json(cli.dir_to_json(project), compact=False)
+    assert stdout.getvalue() == expected.decode("utf-8") + "\n"
+
+
+def test_output_file_is_written_without_stdout(project, monkeypatch, capsysbinary):
+    assert run(monkeypatch, ".", "-o", "../out.json") == 0
+
+    captured = capsysbinary.readouterr()
+    assert captured.out == b""
+    assert b"Output written to" in captured.err
+    expected = cli._encode_json(cli.dir_to_json(project), compact=False)
+    assert (project.parent / "out.json").read_bytes() == expected
+
+
+@pytest.mark.parametrize("text_only", [False, True])
+def test_ndjson_goes_to_stdout(project, monkeypatch, capsysbinary, text_only):
+    expected = io.BytesIO()
+    cli.dir_to_ndjson(project, None, expected)
+
+    if text_only:
+        stdout = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", stdout)
+        assert run(monkeypatch, ".", "--ndjson") == 0
+        assert stdout.getvalue() == expected.getvalue().decode("utf-8")
+    else:
+        assert run(monkeypatch, ".", "--ndjson") == 0
+        assert capsysbinary.readouterr().out == expected.getvalue()
+
+
+def test_ndjson_output_file_matches_stdout(project, monkeypatch, capsysbinary):
+    assert run(monkeypatch, ".", "--ndjson") == 0
+    assert run(monkeypatch, ".", "--ndjson", "-o", "../out.ndjson") == 0
+
+    written = (project.parent / "out.ndjson").read_bytes()
+    assert written == capsysbinary.readouterr().out
+
+
+def test_ndjson_rejects_github_urls(monkeypatch, capsys):
+    with pytest.raises(SystemExit) as excinfo:
+        run(monkeypatch, "https://github.com/owner/repo", "--ndjson")
+
+    assert excinfo.value.code == 2
+    assert "only supported for local directories" in capsys.readouterr().err
+
+
+def test_missing_directory_is_reported(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert run(monkeypatch, "nope") == 1
+    assert capsys.readouterr().err == (
+        f"Error: Directory not found: {os.path.join(os.getcwd(), 'nope')}\n"
+    )
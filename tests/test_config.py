@@ -0,0 +1,97 @@
+"""Tests for TreesonConfig and its ignore rules."""
+
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+from treeson.cli import DEFAULT_IGNORES, TreesonConfig, dir_to_json
+
+
+@pytest.mark.parametrize("name", ["node_modules", "__pycache__", "dist", "build"])
+def test_default_exact_names_are_ignored(name):
+    assert TreesonConfig().should_ignore(name)
+
+
+@pytest.mark.parametrize("name", ["src", "main.py", "distribution", "my_build"])
+def test_other_names_are_kept(name):
+    assert not TreesonConfig().should_ignore(name)
+
+
+def test_default_egg_info_glob_is_ignored():
+    config = TreesonConfig()
+    assert config.should_ignore("treeson.egg-info")
+    assert not config.should_ignore("egg-info.txt")
+
+
+@pytest.mark.parametrize(
+    "name, ignored",
+    [
+        ("app.log", True),
+        (".log", True),
+        ("app.log.1", False),
+        ("app.LOG", False),
+        ("log", False),
+        ("a.tmp", True),
+        ("ab.tmp", False),
+        ("cache1", True),
+        ("cacheX", False),
+    ],
+)
+def test_glob_patterns_match_whole_names(name, ignored):
+    config = TreesonConfig(
+        ignores={"*.log", "?.tmp", "cache[0-9]"}, include_hidden=True
+    )
+    assert config.should_ignore(name) is ignored
+
+
+def test_names_without_glob_characters_match_exactly():
+    config = TreesonConfig(ignores={"a.b", "x+y"})
+    assert config.should_ignore("a.b")
+    assert config.should_ignore("x+y")
+    assert not config.should_ignore("aXb")
+    assert not config.should_ignore("xxy")
+
+
+def test_hidden_names_are_ignored_unless_included():
+    assert TreesonConfig().should_ignore(".env")
+    assert not TreesonConfig(include_hidden=True).should_ignore(".env")
+    # Explicit ignores still apply to hidden names
+    assert TreesonConfig(include_hidden=True).should_ignore(".git")
+
+
+def test_ignores_are_stored_as_frozenset():
+    config = TreesonConfig(ignores={"foo"})
+    assert config.ignores == frozenset({"foo"})
+    assert TreesonConfig().ignores == DEFAULT_IGNORES
+
+
+def test_config_is_immutable():
+    config = TreesonConfig()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.include_hidden = True
+
+    derived = dataclasses.replace(config, include_hidden=True, ignores={"foo"})
+    assert not derived.should_ignore(".env")
+    assert derived.should_ignore("foo")
+    assert not derived.should_ignore("node_modules")
+
+
+def test_config_can_be_pickled_after_use(tmp_path):
+    config = TreesonConfig(ignores={"*.log", "tmp"}, max_depth=3)
+    dir_to_json(tmp_path, config)
+
+    restored = pickle.loads(pickle.dumps(config))
+    assert restored == config
+    assert restored.should_ignore("app.log")
+    assert not restored.should_ignore("app.txt")
+
+
+def test_copies_do_not_share_ignore_answers():
+    config = TreesonConfig()
+    assert config.should_ignore(".env")
+
+    hidden = dataclasses.replace(copy.copy(config), include_hidden=True)
+    assert not hidden.should_ignore(".env")
+    assert config.should_ignore(".env")
@@ -0,0 +1,217 @@
+"""Tests for fetching and caching GitHub repository trees."""
+
+import gzip
+import json
+import re
+from urllib.parse import unquote, urlsplit
+
+import pytest
+import responses
+
+from treeson import cli
+from treeson.cli import GitHubAPIError, TreesonConfig, github_repo_to_json
+
+URL = "https://github.com/owner/repo"
+TREES_URL = re.compile(r"https://api\.github\.com/repos/owner/repo/git/trees/.+")
+
+FILES = [
+    "README.md",
+    ".github/workflows/ci.yml",
+    "docs/index.md",
+    "src/main.py",
+    "src/lib/util.py",
+    "src/lib/deep/core.py",
+    "tests/test_main.py",
+    "node_modules/pkg/index.js",
+]
+
+
+def recursive_listing(paths):
+    """Return entries for paths in the order of a recursive GitHub listing."""
+    entries = {}
+    for path in paths:
+        parts = path.split("/")
+        for i in range(1, len(parts)):
+            entries.setdefault("/".join(parts[:i]), "tree")
+        entries[path] = "blob"
+    return [
+        {"path": path, "type": kind, "sha": path}
+        for path, kind in sorted(entries.items())
+    ]
+
+
+class FakeGitHub:
+    """Serve git/trees requests from a fixed listing, like the GitHub API."""
+
+    etag = '"v1"'
+
+    def __init__(self, paths, limit=None):
+        self.entries = recursive_listing(paths)
+        self.limit = limit
+        self.failing = {}
+
+    def __call__(self, request):
+        url = urlsplit(request.url)
+        sha = unquote(url.path.split("/git/trees/", 1)[1])
+        recursive = "recursive=1" in url.query
+
+        if sha in self.failing:
+            return self.failing[sha]
+        if sha == "main" and request.headers.get("If-None-Match") == self.etag:
+            return 304, {}, b""
+
+        prefix = "" if sha == "main" else sha + "/"
+        tree = [
+            dict(entry, path=entry["path"][len(prefix):])
+            for entry in self.entries
+            if entry["path"].startswith(prefix)
+        ]
+        if not recursive:
+            tree = [entry for entry in tree if "/" not in entry["path"]]
+
+        truncated = recursive and self.limit is not None and len(tree) > self.limit
+        if truncated:
+            tree = tree[:self.limit]
+
+        headers = {"ETag": self.etag} if sha == "main" else {}
+        return 200, headers, json.dumps({"tree": tree, "truncated": truncated})
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    """Keep the response cache inside the test's temporary directory."""
+    path = tmp_path / "cache" / "tree.json.gz"
+    monkeypatch.setattr(cli, "_github_cache_path", lambda owner, repo, branch: path)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    return path
+
+
+@pytest.fixture
+def mock_api():
+    with responses.RequestsMock() as rsps:
+        yield rsps
+
+
+def serve(mock_api, github):
+    mock_api.add_callback(responses.GET, TREES_URL, callback=github)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5])
+@pytest.mark.parametrize("legacy_schema", [False, True])
+def test_truncated_tree_matches_recursive_listing(
+    mock_api, cache_path, limit, legacy_schema
+):
+    config = TreesonConfig(include_hidden=True, legacy_schema=legacy_schema)
+    serve(mock_api, FakeGitHub(FILES))
+    expected = github_repo_to_json(URL, config, use_cache=False)
+
+    mock_api.reset()
+    serve(mock_api, FakeGitHub(FILES, limit=limit))
+    assert github_repo_to_json(URL, config, use_cache=False) == expected
+
+
+def test_cached_truncated_tree_serves_other_configs(
+    mock_api, cache_path, monkeypatch
+):
+    serve(mock_api, FakeGitHub(FILES, limit=2))
+    default = github_repo_to_json(URL, TreesonConfig())
+    assert ".github" not in default["dirs"]
+    assert "node_modules" not in default["dirs"]
+
+    # Served from the fresh cache, without asking the API again
+    calls = len(mock_api.calls)
+    hidden = github_repo_to_json(URL, TreesonConfig(include_hidden=True))
+    assert len(mock_api.calls) == calls
+    assert hidden["dirs"][".github"]["dirs"]["workflows"]["files"] == ["ci.yml"]
+
+    # And after revalidating it with the ETag
+    monkeypatch.setattr(cli, "GITHUB_CACHE_TTL", 0)
+    assert github_repo_to_json(URL, TreesonConfig(include_hidden=True)) == hidden
+    assert mock_api.calls[-1].response.status_code == 304
+
+
+def test_not_modified_response_reuses_cached_tree(
+    mock_api, cache_path, monkeypatch
+):
+    serve(mock_api, FakeGitHub(FILES))
+    first = github_repo_to_json(URL, TreesonConfig())
+    assert cache_path.exists()
+
+    monkeypatch.setattr(cli, "GITHUB_CACHE_TTL", 0)
+    assert github_repo_to_json(URL, TreesonConfig()) == first
+
+    request = mock_api.calls[-1].request
+    assert request.headers["If-None-Match"] == FakeGitHub.etag
+    assert mock_api.calls[-1].response.status_code == 304
+
+
+def broken_gzip_body():
+    body = gzip.compress(json.dumps({"tree": [], "truncated": False}).encode())
+    return 200, {"Content-Encoding": "gzip"}, body[:-8]
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [(500, {}, b"{}"), broken_gzip_body()],
+    ids=["server-error", "broken-body"],
+)
+def test_failing_subtree_is_skipped_and_not_cached(
+    mock_api, cache_path, capsys, failure
+):
+    github = FakeGitHub(FILES, limit=2)
+    github.failing["src"] = failure
+    serve(mock_api, github)
+
+    tree = github_repo_to_json(URL, TreesonConfig())
+    assert tree["dirs"]["src"] == {"files": [], "dirs": {}}
+    assert tree["dirs"]["docs"]["files"] == ["index.md"]
+    assert "Warning: Skipping src" in capsys.readouterr().err
+    assert not cache_path.exists()
+
+    # The next run fetches the repository again instead of reusing the gap
+    github.failing.clear()
+    tree = github_repo_to_json(URL, TreesonConfig())
+    assert tree["dirs"]["src"]["dirs"]["lib"]["files"] == ["util.py"]
+    assert cache_path.exists()
+
+
+def test_broken_body_raises_github_api_error(mock_api, cache_path):
+    github = FakeGitHub(FILES)
+    github.failing["main"] = broken_gzip_body()
+    serve(mock_api, github)
+
+    with pytest.raises(GitHubAPIError, match="Network error"):
+        github_repo_to_json(URL, TreesonConfig(), use_cache=False)
+
+
+@pytest.mark.parametrize("incremental", [True, False], ids=["ijson", "json"])
+def test_invalid_json_raises_github_api_error(
+    mock_api, cache_path, monkeypatch, incremental
+):
+    if not incremental:
+        monkeypatch.setattr(cli, "ijson", None)
+    github = FakeGitHub(FILES)
+    github.failing["main"] = (200, {}, b'{"tree": [{"path": "a"')
+    serve(mock_api, github)
+
+    with pytest.raises(GitHubAPIError, match="Invalid response"):
+        github_repo_to_json(URL, TreesonConfig(), use_cache=False)
+
+
+def test_unexpected_error_cancels_queued_subtrees(mock_api, cache_path, monkeypatch):
+    serve(mock_api, FakeGitHub(FILES, limit=2))
+    fetch_subtree = cli._fetch_subtree
+    fetched = []
+
+    def failing_fetch_subtree(session, trees_url, repo_name, sha):
+        fetched.append(sha)
+        if sha == ".github":
+            raise RuntimeError("boom")
+        return fetch_subtree(session, trees_url, repo_name, sha)
+
+    monkeypatch.setattr(cli, "GITHUB_MAX_WORKERS", 1)
+    monkeypatch.setattr(cli, "_fetch_subtree", failing_fetch_subtree)
+    with pytest.raises(RuntimeError, match="boom"):
+        github_repo_to_json(URL, TreesonConfig(), use_cache=False)
+
+    assert "tests" not in fetched
@@ -0,0 +1,116 @@
+"""Tests for building directory structures from GitHub tree entries."""
+
+import json
+import random
+
+import pytest
+
+from treeson.cli import TreesonConfig, _build_github_tree
+
+NAMES = ["a", "B", "c.py", ".github", "node_modules", "__init__.py", "ü", "dist"]
+
+
+def reference_tree(tree, config):
+    """The original builder, which walks every entry's path from the root."""
+    root = {}
+
+    for node in tree:
+        path_parts = node["path"].split("/")
+
+        if any(config.should_ignore(part) for part in path_parts):
+            continue
+
+        current = root
+        for part in path_parts[:-1]:
+            if part not in current:
+                current[part] = {"files": []}
+            current = current[part]
+
+        final_part = path_parts[-1]
+        if node["type"] == "blob":
+            if "files" not in current:
+                current["files"] = []
+            current["files"].append(final_part)
+        elif node["type"] == "tree":
+            if final_part not in current:
+                current[final_part] = {"files": []}
+
+    return root
+
+
+def to_dirs_schema(node):
+    """Convert a legacy node to the schema with subdirectories under "dirs"."""
+    return {
+        "files": node.get("files", []),
+        "dirs": {
+            name: to_dirs_schema(child)
+            for name, child in node.items()
+            if name != "files"
+        },
+    }
+
+
+def random_entries(seed):
+    """Generate entries in the order of a recursive GitHub listing."""
+    rng = random.Random(seed)
+    entries = []
+
+    def add(prefix, depth):
+        for name in sorted(rng.sample(NAMES, rng.randint(0, 5))):
+            path = prefix + name
+            if depth < 4 and rng.random() < 0.5:
+                entries.append({"path": path, "type": "tree"})
+                add(path + "/", depth + 1)
+            else:
+                entries.append({"path": path, "type": "blob"})
+
+    add("", 0)
+    return entries
+
+
+CONFIGS = [
+    {},
+    {"include_hidden": True},
+    {"ignores": {"dist", "*.py"}},
+]
+
+
+@pytest.mark.parametrize("options", CONFIGS)
+@pytest.mark.parametrize("seed", range(50))
+def test_sorted_entries_match_reference(seed, options):
+    entries = random_entries(seed)
+    legacy = TreesonConfig(legacy_schema=True, **options)
+    expected = reference_tree(entries, legacy)
+
+    # Same document, including key and file order
+    assert json.dumps(_build_github_tree(entries, legacy)) == json.dumps(expected)
+    assert _build_github_tree(entries, TreesonConfig(**options)) == to_dirs_schema(
+        expected
+    )
+
+
+@pytest.mark.parametrize("options", CONFIGS)
+@pytest.mark.parametrize("seed", range(50))
+def test_shuffled_entries_match_reference(seed, options):
+    entries = random_entries(seed)
+    random.Random(seed).shuffle(entries)
+    legacy = TreesonConfig(legacy_schema=True, **options)
+    expected = reference_tree(entries, legacy)
+
+    assert _build_github_tree(entries, legacy) == expected
+    assert _build_github_tree(entries, TreesonConfig(**options)) == to_dirs_schema(
+        expected
+    )
+
+
+def test_entries_are_consumed_once():
+    entries = [
+        {"path": "src", "type": "tree"},
+        {"path": "src/main.py", "type": "blob"},
+        {"path": "README.md", "type": "blob"},
+    ]
+    tree = _build_github_tree(iter(entries), TreesonConfig())
+    assert tree == {
+        "files": ["README.md"],
+        "dirs": {"src": {"files": ["main.py"], "dirs": {}}},
+    }
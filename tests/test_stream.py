@@ -0,0 +1,94 @@
+"""Tests for the streaming directory writers."""
+
+import io
+import json
+
+import pytest
+
+from treeson import cli
+from treeson.cli import (
+    TreesonConfig,
+    _encode_json,
+    dir_to_json,
+    dir_to_json_stream,
+    dir_to_ndjson,
+)
+
+
+@pytest.fixture
+def sample_tree(tmp_path):
+    """Create a small directory tree with names that exercise filtering."""
+    files = [
+        "README.md",
+        "b.txt",
+        "A.txt",
+        ".env",
+        'say "hi".txt',
+        "ünïcode.py",
+        "src/main.py",
+        "src/Utils/helpers.py",
+        "src/utils2/__init__.py",
+        "src/.hidden/secret.txt",
+        "node_modules/pkg/index.js",
+        "treeson.egg-info/PKG-INFO",
+        "docs/guide/deep/deeper/page.md",
+    ]
+    for name in files:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    (tmp_path / "empty").mkdir()
+    return tmp_path
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Run the comparison with orjson, when installed, and with the stdlib."""
+    if request.param == "json":
+        monkeypatch.setattr(cli, "orjson", None)
+    elif cli.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("legacy_schema", [False, True])
+@pytest.mark.parametrize("include_hidden", [False, True])
+@pytest.mark.parametrize("max_depth", [None, 0, 1, 2])
+def test_stream_matches_compact_output(
+    sample_tree, encoder, legacy_schema, include_hidden, max_depth
+):
+    config = TreesonConfig(
+        include_hidden=include_hidden,
+        max_depth=max_depth,
+        legacy_schema=legacy_schema
+    )
+    fp = io.StringIO()
+    dir_to_json_stream(sample_tree, config, fp)
+
+    expected = _encode_json(dir_to_json(sample_tree, config), compact=True)
+    assert fp.getvalue().encode("utf-8") == expected
+
+
+def test_stream_without_sorting_matches_compact_output(sample_tree, encoder):
+    config = TreesonConfig(sort=False)
+    fp = io.StringIO()
+    dir_to_json_stream(sample_tree, config, fp)
+
+    expected = _encode_json(dir_to_json(sample_tree, config), compact=True)
+    assert fp.getvalue().encode("utf-8") == expected
+
+
+def test_ndjson_lists_every_directory(sample_tree):
+    config = TreesonConfig()
+    fp = io.BytesIO()
+    dir_to_ndjson(sample_tree, config, fp)
+
+    lines = [json.loads(line) for line in fp.getvalue().splitlines()]
+    assert lines[0] == {
+        "path": ".",
+        "files": ["A.txt", "b.txt", "README.md", 'say "hi".txt', "ünïcode.py"],
+    }
+    paths = [line["path"] for line in lines]
+    assert "src/Utils" in paths
+    assert "empty" in paths
+    assert not any("node_modules" in path or ".hidden" in path for path in paths)
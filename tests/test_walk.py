@@ -0,0 +1,51 @@
+"""Tests for the local directory walk."""
+
+import os
+
+import pytest
+
+from treeson import cli
+from treeson.cli import TreesonConfig, dir_to_json
+
+
+@pytest.fixture
+def wide_tree(tmp_path):
+    """Create enough top-level directories for the walk to use threads."""
+    for i in range(cli.PARALLEL_MIN_SUBDIRS * 2):
+        for name in ("a.txt", f"sub/b{i}.txt", "sub/deep/c.txt", ".hidden/d.txt"):
+            path = tmp_path / f"d{i}" / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+    (tmp_path / "top.txt").write_text("")
+    return tmp_path
+
+
+@pytest.mark.parametrize("legacy_schema", [False, True])
+@pytest.mark.parametrize("max_depth", [None, 1, 2])
+def test_parallel_walk_matches_sequential(wide_tree, legacy_schema, max_depth):
+    options = {"legacy_schema": legacy_schema, "max_depth": max_depth}
+    parallel = dir_to_json(wide_tree, TreesonConfig(max_workers=2, **options))
+    sequential = dir_to_json(wide_tree, TreesonConfig(parallel=False, **options))
+
+    assert parallel == sequential
+    assert list(parallel if legacy_schema else parallel["dirs"]) == (
+        ["files"] if legacy_schema else []
+    ) + [f"d{i}" for i in range(cli.PARALLEL_MIN_SUBDIRS * 2)]
+
+
+def test_failing_subtree_cancels_queued_subtrees(wide_tree, monkeypatch):
+    list_dir = cli._list_dir
+    listed = []
+
+    def failing_list_dir(dir_path, *args):
+        name = os.path.basename(dir_path)
+        listed.append(name)
+        if name == "d0":
+            raise RuntimeError("boom")
+        return list_dir(dir_path, *args)
+
+    monkeypatch.setattr(cli, "_list_dir", failing_list_dir)
+    with pytest.raises(RuntimeError, match="boom"):
+        dir_to_json(wide_tree, TreesonConfig(max_workers=1))
+
+    assert f"d{cli.PARALLEL_MIN_SUBDIRS * 2 - 1}" not in listed
@@ -0,0 +1,82 @@
+"""
+Per-directory listing loop used by the treeson directory walkers.
+
+This is the innermost part of every traversal: it runs once for each entry
+of each directory. It lives in its own module, written in plain Python that
+Cython also accepts, so it can be compiled in place for a faster loop::
+
+    pip install cython
+    cythonize -i -3 treeson/_walk.py
+
+Python's import system prefers an extension module over a source file of
+the same name, so the compiled module is picked up automatically and this
+file remains the fallback when it is not built.
+"""
+
+import os
+import sys
+from typing import Callable, List, Tuple
+
+
+def _subdir_sort_key(subdir: Tuple[str, str]) -> str:
+    """Sort (name, path) pairs by case-insensitive name."""
+    return subdir[0].lower()
+
+
+def list_dir(
+    dir_path: str,
+    should_ignore: Callable[[str], bool],
+    skip_hidden: bool,
+    sort: bool = True
+) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    List one directory, returning file names and (name, path) pairs for its
+    subdirectories, sorted by case-insensitive name unless sort is False.
+
+    os.scandir is used so the file type reported by the directory listing is
+    reused instead of issuing a stat call per entry. Ignored names are
+    dropped before anything else looks at them, so an ignored directory is
+    never classified, sorted or opened. Each entry is classified exactly
+    once and sorting only looks at names. Entries that cannot be accessed
+    are reported on stderr and skipped.
+
+    Names are interned: trees repeat names like ``__init__.py`` or
+    ``index.js`` thousands of times, and interning makes every occurrence
+    share one string. Interned strings live until the process exits, which
+    is fine for a short CLI run.
+    """
+    files: List[str] = []
+    subdirs: List[Tuple[str, str]] = []
+    entries: list = []
+    intern = sys.intern
+    name: str
+
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                name = entry.name
+                # Hidden names are the most common skip; avoid the method call
+                if skip_hidden and name.startswith("."):
+                    continue
+                if not should_ignore(name):
+                    entries.append(entry)
+    except PermissionError:
+        print(f"Warning: Permission denied accessing {dir_path}", file=sys.stderr)
+        return files, subdirs
+
+    for entry in entries:
+        name = intern(entry.name)
+        try:
+            if entry.is_file():
+                files.append(name)
+            elif entry.is_dir():
+                subdirs.append((name, entry.path))
+        except PermissionError:
+            print(f"Warning: Permission denied accessing {entry.path}", file=sys.stderr)
+            continue
+
+    if sort:
+        files.sort(key=str.lower)
+        subdirs.sort(key=_subdir_sort_key)
+
+    return files, subdirs
@@ -7,17 +7,70 @@ and tooling purposes.
 """
 
 import argparse
+import fnmatch
+import functools
+import gzip
+import hashlib
+import io
 import json
+import os
+import re
+import stat
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from json.encoder import encode_basestring
 from pathlib import Path
-from typing import Dict, Set, List, Optional
-from dataclasses import dataclass, field
+from types import ModuleType
+from typing import (
+    IO,
+    BinaryIO,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    TextIO,
+    Tuple,
+    Union,
+    cast,
+)
+
+from treeson._walk import list_dir as _list_dir
 
 try:
     import requests
+    import urllib3
 except ImportError:
     requests = None
+    urllib3 = None  # type: ignore[assignment]
 
+# Declared up front so that mypy also sees the None fallback
+platformdirs: Optional[ModuleType]
+try:
+    import platformdirs
+except ImportError:
+    platformdirs = None
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # type: ignore[import-untyped]
+except ImportError:
+    ijson = None
+
+
+__version__ = "0.2.0"
 
 DEFAULT_IGNORES = frozenset({
     ".git",
@@ -35,19 +88,77 @@ DEFAULT_IGNORES = frozenset({
     "*.egg-info",
 })
 
+# Filesystem path accepted by the public directory functions
+StrPath = Union[str, "os.PathLike[str]"]
+
+# Characters that turn an ignore entry into a shell-style glob pattern
+GLOB_CHARS = frozenset("*?[")
+
+# Seconds a cached GitHub tree is reused without asking the API again
+GITHUB_CACHE_TTL = 15 * 60
+
+# Distinct names whose ignore decision is remembered per configuration
+IGNORE_CACHE_SIZE = 4096
 
-@dataclass
+# Concurrent requests used to fetch a truncated GitHub tree
+GITHUB_MAX_WORKERS = 16
+
+# Minimum number of subdirectories before traversal is spread over threads
+PARALLEL_MIN_SUBDIRS = 4
+
+
+@dataclass(frozen=True)
 class TreesonConfig:
-    """Configuration for treeson operations."""
-    ignores: Set[str] = field(default_factory=lambda: set(DEFAULT_IGNORES))
+    """
+    Configuration for treeson operations.
+
+    The configuration is immutable because the ignore patterns are compiled
+    once when it is created; use dataclasses.replace to derive a variant.
+    """
+    ignores: FrozenSet[str] = DEFAULT_IGNORES
     include_hidden: bool = False
     max_depth: Optional[int] = None
+    parallel: bool = True
+    max_workers: Optional[int] = None
+    sort: bool = True
+    legacy_schema: bool = False
+    _exact: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    _glob_re: Optional[Pattern[str]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Split ignores into exact names and one precompiled glob regex."""
+        exact = set()
+        globs = []
+        for pattern in self.ignores:
+            if GLOB_CHARS.isdisjoint(pattern):
+                exact.add(pattern)
+            else:
+                globs.append(fnmatch.translate(pattern))
+
+        # Accept any iterable of names, e.g. a plain set
+        object.__setattr__(self, "ignores", frozenset(self.ignores))
+        object.__setattr__(self, "_exact", frozenset(exact))
+        object.__setattr__(
+            self, "_glob_re", re.compile("|".join(globs)) if globs else None
+        )
 
     def should_ignore(self, name: str) -> bool:
         """Check if a file or directory should be ignored."""
         if not self.include_hidden and name.startswith('.'):
             return True
-        return name in self.ignores
+        if name in self._exact:
+            return True
+        return self._glob_re is not None and self._glob_re.match(name) is not None
+
+    def _memoized_should_ignore(self) -> Callable[[str], bool]:
+        """
+        Return should_ignore memoized for the length of one walk.
+
+        Names like ``__init__.py`` or ``README.md`` recur all over a tree.
+        The cache lives with the walk rather than on the config, so the
+        config stays picklable and copies never share stale answers.
+        """
+        return functools.lru_cache(maxsize=IGNORE_CACHE_SIZE)(self.should_ignore)
 
 
 class TreesonError(Exception):
@@ -66,7 +177,7 @@ class GitHubAPIError(TreesonError):
 
 
 def dir_to_json(
-    path: Path,
+    path: StrPath,
     config: Optional[TreesonConfig] = None,
     current_depth: int = 0
 ) -> Dict:
@@ -88,52 +199,536 @@ def dir_to_json(
     if config is None:
         config = TreesonConfig()
 
-    if not path.exists():
+    # The walk itself only handles plain strings, never Path objects
+    path = os.fspath(path)
+    _check_directory(path)
+
+    should_ignore = config._memoized_should_ignore()
+    if not config.parallel:
+        return _scan_dir(path, config, current_depth, should_ignore)
+
+    with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+        return _scan_dir(path, config, current_depth, should_ignore, executor)
+
+
+def dir_to_json_stream(
+    path: StrPath,
+    config: Optional[TreesonConfig],
+    fp: TextIO
+) -> None:
+    """
+    Write a directory structure as compact JSON directly to a file object.
+
+    Produces the same document as ``--compact`` output of
+    ``dir_to_json(path, config)`` without building the tree in memory: each
+    directory is written out as soon as it has been listed, so memory use
+    grows with the depth of the tree rather than its size.
+
+    Args:
+        path: Path to the directory to convert
+        config: Configuration object for filtering and options
+        fp: Text file object the JSON document is written to
+
+    Raises:
+        DirectoryNotFoundError: If the path doesn't exist
+    """
+    if config is None:
+        config = TreesonConfig()
+
+    path = os.fspath(path)
+    _check_directory(path)
+
+    should_ignore = config._memoized_should_ignore()
+    skip_hidden = not config.include_hidden
+    sort = config.sort
+    max_depth = config.max_depth
+    legacy = config.legacy_schema
+    write = fp.write
+
+    # Text that opens a node's subdirectories and closes the whole node
+    open_dirs, close_node = ("", "}") if legacy else (',"dirs":{', "}}")
+
+    # Each stack item holds the not yet written subdirectories of an open
+    # JSON object, along with that directory's depth.
+    stack: List[Tuple[Iterator[Tuple[str, str]], int]] = []
+    dir_path, depth = path, 0
+
+    while True:
+        if max_depth is not None and depth >= max_depth:
+            files: List[str] = []
+            subdirs: List[Tuple[str, str]] = []
+        else:
+            files, subdirs = _list_dir(dir_path, should_ignore, skip_hidden, sort)
+
+        write('{"files":[%s]%s' % (",".join(map(encode_basestring, files)), open_dirs))
+        stack.append((iter(subdirs), depth))
+        first = True
+
+        # Close finished objects until one has a subdirectory left to write
+        while stack:
+            entries, parent_depth = stack[-1]
+            entry = next(entries, None)
+            if entry is not None:
+                break
+            stack.pop()
+            write(close_node)
+            first = False
+        else:
+            return
+
+        name, dir_path = entry
+        if first and not legacy:
+            write("%s:" % encode_basestring(name))
+        else:
+            write(",%s:" % encode_basestring(name))
+        depth = parent_depth + 1
+
+
+def dir_to_ndjson(
+    path: StrPath,
+    config: Optional[TreesonConfig],
+    fp: BinaryIO
+) -> None:
+    """
+    Write a directory structure as newline-delimited JSON, one directory per line.
+
+    Each line is a compact object ``{"path": ..., "files": [...]}`` where
+    path is relative to the starting directory ("." for the root) and uses
+    "/" as separator. Directories are written in depth-first order as soon
+    as they have been listed and no container is built, so neither the
+    writer nor a line-oriented reader needs to hold the whole tree.
+
+    Args:
+        path: Path to the directory to convert
+        config: Configuration object for filtering and options
+        fp: Binary file object the UTF-8 encoded lines are written to
+
+    Raises:
+        DirectoryNotFoundError: If the path doesn't exist
+    """
+    if config is None:
+        config = TreesonConfig()
+
+    path = os.fspath(path)
+    _check_directory(path)
+
+    should_ignore = config._memoized_should_ignore()
+    skip_hidden = not config.include_hidden
+    sort = config.sort
+    max_depth = config.max_depth
+    write = fp.write
+
+    stack = [(path, ".", 0)]
+
+    while stack:
+        dir_path, rel_path, depth = stack.pop()
+
+        if max_depth is not None and depth >= max_depth:
+            files: List[str] = []
+            subdirs: List[Tuple[str, str]] = []
+        else:
+            files, subdirs = _list_dir(dir_path, should_ignore, skip_hidden, sort)
+
+        write(_encode_json({"path": rel_path, "files": files}, compact=True) + b"\n")
+
+        # Push in reverse so subdirectories come out in listing order
+        prefix = "" if depth == 0 else rel_path + "/"
+        for name, sub_path in reversed(subdirs):
+            stack.append((sub_path, prefix + name, depth + 1))
+
+
+def _check_directory(path: str) -> None:
+    """Raise a TreesonError unless path is an existing directory."""
+    try:
+        mode = os.stat(path).st_mode
+    except (FileNotFoundError, NotADirectoryError):
         raise DirectoryNotFoundError(f"Directory not found: {path}")
 
-    if not path.is_dir():
+    if not stat.S_ISDIR(mode):
         raise TreesonError(f"Path is not a directory: {path}")
 
-    result = {"files": []}
 
-    # Check max depth
-    if config.max_depth is not None and current_depth >= config.max_depth:
-        return result
+def _new_node(legacy: bool) -> Dict:
+    """
+    Return an empty directory node.
 
-    try:
-        items = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower()))
-    except PermissionError as e:
-        print(f"Warning: Permission denied accessing {path}", file=sys.stderr)
-        return result
+    Subdirectories live under a separate "dirs" object, so every key of a
+    node has a fixed type; the legacy schema mixes them in next to "files".
+    """
+    return {"files": []} if legacy else {"files": [], "dirs": {}}
+
+
+def _scan_dir(
+    path: str,
+    config: TreesonConfig,
+    current_depth: int,
+    should_ignore: Callable[[str], bool],
+    _executor: Optional[ThreadPoolExecutor] = None
+) -> Dict:
+    """
+    Convert a directory, given as a plain string path.
 
-    for item in items:
-        if config.should_ignore(item.name):
+    The tree is walked iteratively with an explicit stack, creating each
+    subdirectory's dict as soon as it is listed so that nodes keep their
+    sorted order.
+
+    When an executor is given and the starting directory has enough
+    subdirectories, each of them is walked as a separate task; nested
+    levels never submit work so workers never wait on each other.
+    """
+    skip_hidden = not config.include_hidden
+    sort = config.sort
+    max_depth = config.max_depth
+
+    legacy = config.legacy_schema
+    result = _new_node(legacy)
+    stack = [(path, result, current_depth)]
+
+    while stack:
+        dir_path, node, depth = stack.pop()
+
+        # Check max depth
+        if max_depth is not None and depth >= max_depth:
             continue
 
-        try:
-            if item.is_file():
-                result["files"].append(item.name)
-            elif item.is_dir():
-                result[item.name] = dir_to_json(item, config, current_depth + 1)
-        except PermissionError:
-            print(f"Warning: Permission denied accessing {item}", file=sys.stderr)
+        files, subdirs = _list_dir(dir_path, should_ignore, skip_hidden, sort)
+        node["files"] = files
+        children = node if legacy else node["dirs"]
+
+        if (
+            node is result
+            and _executor is not None
+            and len(subdirs) >= PARALLEL_MIN_SUBDIRS
+        ):
+            futures = [
+                (name, _executor.submit(
+                    _scan_dir, sub_path, config, depth + 1, should_ignore
+                ))
+                for name, sub_path in subdirs
+            ]
+            try:
+                for name, future in futures:
+                    children[name] = future.result()
+            except BaseException:
+                # Shutting the executor down would otherwise walk every
+                # queued subtree before the error reaches the caller
+                for _, future in futures:
+                    future.cancel()
+                raise
             continue
 
+        for name, sub_path in subdirs:
+            child = _new_node(legacy)
+            children[name] = child
+            stack.append((sub_path, child, depth + 1))
+
     return result
 
 
+def _github_cache_path(owner: str, repo: str, branch: str) -> Path:
+    """Return the cache file used for a repository tree."""
+    if platformdirs is not None:
+        cache_dir = Path(platformdirs.user_cache_dir("treeson"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+        cache_dir = Path(base).expanduser() / "treeson"
+
+    key = hashlib.sha256(f"{owner}/{repo}@{branch}".encode("utf-8")).hexdigest()
+    return cache_dir / f"{key}.json.gz"
+
+
+def _read_github_cache(cache_path: Path) -> Optional[Dict]:
+    """Load a cached GitHub response, or None if missing or unreadable."""
+    try:
+        with gzip.open(cache_path, "rt", encoding="utf-8") as fp:
+            cached = json.load(fp)
+    except (OSError, EOFError, ValueError):
+        return None
+
+    if not isinstance(cached, dict) or "body" not in cached:
+        return None
+    return cached
+
+
+def _write_github_cache(cache_path: Path, etag: Optional[str], body: Dict) -> None:
+    """Store a gzip-compressed GitHub response; failures only disable caching."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(cache_path, "wt", encoding="utf-8") as fp:
+            json.dump({"etag": etag, "mtime": time.time(), "body": body}, fp)
+    except OSError:
+        pass
+
+
+def _github_headers() -> Dict[str, str]:
+    """Build request headers, authenticating with GITHUB_TOKEN when set."""
+    headers = {
+        "Accept": "application/vnd.github+json",
+        "Accept-Encoding": "gzip, deflate",
+        "User-Agent": f"treeson/{__version__}",
+    }
+    token = os.environ.get("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _github_session() -> "requests.Session":
+    """Create a session whose connection pool fits GITHUB_MAX_WORKERS requests."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=GITHUB_MAX_WORKERS, pool_maxsize=GITHUB_MAX_WORKERS
+    )
+    session.mount("https://", adapter)
+    session.headers.update(_github_headers())
+    return session
+
+
+def _github_get(
+    session: "requests.Session",
+    url: str,
+    repo_name: str,
+    ref: str,
+    headers: Optional[Dict[str, str]] = None
+) -> "requests.Response":
+    """
+    Send a GET to the GitHub API, translating failures into GitHubAPIError.
+
+    The body is not downloaded yet; read it with _read_json.
+    """
+    try:
+        resp = session.get(url, headers=headers, timeout=10, stream=True)
+        resp.raise_for_status()
+    except requests.exceptions.Timeout:
+        raise GitHubAPIError(f"Request timeout for repository: {repo_name}")
+    except requests.exceptions.HTTPError as e:
+        if resp.status_code == 404:
+            raise GitHubAPIError(
+                f"Repository or branch not found: {repo_name}@{ref}"
+            )
+        raise GitHubAPIError(f"GitHub API error: {e}")
+    except requests.exceptions.RequestException as e:
+        raise GitHubAPIError(f"Network error: {e}")
+    return resp
+
+
+@contextmanager
+def _open_body(resp: "requests.Response") -> Iterator[IO[bytes]]:
+    """
+    Open a streamed response body as a decoded binary file object.
+
+    gzip bodies are decompressed from the raw socket stream as they are
+    read, instead of first being collected into one buffer by requests.
+    The body only arrives while it is consumed, so failures while reading
+    or decoding it are raised as GitHubAPIError here.
+    """
+    with resp:
+        raw = resp.raw
+        try:
+            if resp.headers.get("Content-Encoding", "").lower() == "gzip":
+                # Decompressed here, so urllib3 must pass the bytes through
+                raw.decode_content = False
+                with gzip.GzipFile(fileobj=raw) as stream:
+                    yield cast(IO[bytes], stream)
+            else:
+                raw.decode_content = True
+                yield cast(IO[bytes], raw)
+        except (
+            requests.exceptions.RequestException,
+            urllib3.exceptions.HTTPError,
+            OSError,
+            EOFError
+        ) as e:
+            raise GitHubAPIError(f"Network error: {e}")
+        except ValueError as e:
+            raise GitHubAPIError(f"Invalid response from GitHub API: {e}")
+
+
+def _read_json(resp: "requests.Response") -> Dict:
+    """Decode a streamed JSON response body."""
+    with _open_body(resp) as stream:
+        return cast(Dict, json.load(stream))
+
+
+class _TreeEntries:
+    """
+    Iterate over the entries of a tree response while it is being parsed.
+
+    With ijson installed, entries are produced as the response arrives, so
+    the full body (which can exceed 100 MB) is never held in memory; only
+    "path" and "type" are kept for each entry. Without ijson the body is
+    decoded in one go. ``truncated`` is known once iteration has finished,
+    and ``kept`` collects the entries when ``keep`` is set, e.g. to cache
+    them afterwards.
+    """
+
+    def __init__(self, stream: IO[bytes], keep: bool = False) -> None:
+        self.stream = stream
+        self.truncated = False
+        self.kept: Optional[List[Dict]] = [] if keep else None
+
+    def __iter__(self) -> Iterator[Dict]:
+        entries = self._parse() if ijson is not None else self._load()
+        if self.kept is None:
+            yield from entries
+            return
+
+        keep = self.kept.append
+        for entry in entries:
+            keep(entry)
+            yield entry
+
+    def _load(self) -> Iterator[Dict]:
+        body = json.load(self.stream)
+        self.truncated = bool(body.get("truncated"))
+        for entry in body.get("tree", []):
+            yield {"path": entry["path"], "type": entry["type"]}
+
+    def _parse(self) -> Iterator[Dict]:
+        entry: Dict = {}
+        try:
+            for prefix, event, value in ijson.parse(self.stream):
+                if prefix == "tree.item":
+                    if event == "start_map":
+                        entry = {}
+                    elif event == "end_map":
+                        yield entry
+                elif prefix == "tree.item.path":
+                    entry["path"] = value
+                elif prefix == "tree.item.type":
+                    entry["type"] = value
+                elif prefix == "truncated":
+                    self.truncated = bool(value)
+        except ijson.JSONError as e:
+            raise GitHubAPIError(f"Invalid response from GitHub API: {e}")
+
+
+def _fetch_subtree(
+    session: "requests.Session",
+    trees_url: str,
+    repo_name: str,
+    sha: str
+) -> Tuple[List[Dict], bool]:
+    """
+    Fetch one subtree, recursively if GitHub can return it in full.
+
+    Returns the entries and whether they include every descendant; when the
+    recursive listing is truncated only the direct children are returned.
+    """
+    body = _read_json(
+        _github_get(session, f"{trees_url}/{sha}?recursive=1", repo_name, sha)
+    )
+    if not body.get("truncated"):
+        return body.get("tree", []), True
+
+    body = _read_json(_github_get(session, f"{trees_url}/{sha}", repo_name, sha))
+    return body.get("tree", []), False
+
+
+def _fetch_truncated_tree(
+    session: "requests.Session",
+    trees_url: str,
+    repo_name: str,
+    branch: str
+) -> Tuple[List[Dict], bool]:
+    """
+    Fetch a repository tree too large for a single recursive request.
+
+    The root is listed without recursion and every subdirectory is fetched
+    as its own subtree, GITHUB_MAX_WORKERS at a time. Subtrees that are
+    themselves truncated are split again on the next round. A failing
+    subtree is reported on stderr and left out instead of failing the whole
+    repository. Every subtree is fetched whatever the configuration, so the
+    result can be cached and filtered later like a recursive listing.
+
+    Returns:
+        Entries with full paths, in the order a recursive listing uses, and
+        whether every subtree was fetched
+    """
+    root_body = _read_json(
+        _github_get(session, f"{trees_url}/{branch}", repo_name, branch)
+    )
+
+    # Full-path entries per directory, and whether they cover all descendants
+    listings: Dict[str, Tuple[List[Dict], bool]] = {
+        "": (root_body.get("tree", []), False)
+    }
+    pending = listings[""][0]
+    complete_tree = True
+
+    with ThreadPoolExecutor(max_workers=GITHUB_MAX_WORKERS) as executor:
+        while pending:
+            futures = {
+                executor.submit(
+                    _fetch_subtree, session, trees_url, repo_name, entry["sha"]
+                ): entry["path"]
+                for entry in pending
+                if entry["type"] == "tree"
+            }
+            pending = []
+
+            try:
+                for future in as_completed(futures):
+                    prefix = futures[future]
+                    try:
+                        entries, complete = future.result()
+                    except GitHubAPIError as e:
+                        print(f"Warning: Skipping {prefix}: {e}", file=sys.stderr)
+                        complete_tree = False
+                        continue
+
+                    entries = [
+                        {"path": f"{prefix}/{entry['path']}", "type": entry["type"],
+                         "sha": entry["sha"]}
+                        for entry in entries
+                    ]
+                    listings[prefix] = (entries, complete)
+                    if not complete:
+                        pending.extend(entries)
+            except BaseException:
+                # Do not send the queued requests before the error surfaces
+                for future in futures:
+                    future.cancel()
+                raise
+
+    return list(_flatten_listings(listings, "")), complete_tree
+
+
+def _flatten_listings(
+    listings: Dict[str, Tuple[List[Dict], bool]],
+    prefix: str
+) -> Iterator[Dict]:
+    """Yield the entries below prefix, splicing each subtree after its entry."""
+    entries, complete = listings[prefix]
+    if complete:
+        yield from entries
+        return
+
+    for entry in entries:
+        yield entry
+        if entry["type"] == "tree" and entry["path"] in listings:
+            yield from _flatten_listings(listings, entry["path"])
+
+
 def github_repo_to_json(
     url: str,
     config: Optional[TreesonConfig] = None,
-    branch: str = "main"
+    branch: str = "main",
+    use_cache: bool = True
 ) -> Dict:
     """
     Convert a GitHub repository structure to JSON format.
 
+    Responses are cached gzip-compressed on disk per repository and branch.
+    A cached tree younger than GITHUB_CACHE_TTL is used directly; an older
+    one is revalidated with its ETag, which does not count against the rate
+    limit when the repository is unchanged. Set GITHUB_TOKEN to authenticate.
+
     Args:
         url: GitHub repository URL
         config: Configuration object for filtering
         branch: Branch name to fetch (default: main)
+        use_cache: Read and write the on-disk response cache
 
     Returns:
         Dictionary representing the repository structure
@@ -159,53 +754,165 @@ def github_repo_to_json(
         raise GitHubAPIError(f"Invalid GitHub URL format: {url}")
 
     owner, repo = parts[-2], parts[-1]
-    api_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{branch}?recursive=1"
+    repo_name = f"{owner}/{repo}"
+    trees_url = f"https://api.github.com/repos/{repo_name}/git/trees"
 
-    try:
-        resp = requests.get(api_url, timeout=10)
-        resp.raise_for_status()
-    except requests.exceptions.Timeout:
-        raise GitHubAPIError(f"Request timeout for repository: {owner}/{repo}")
-    except requests.exceptions.HTTPError as e:
-        if resp.status_code == 404:
-            raise GitHubAPIError(
-                f"Repository or branch not found: {owner}/{repo}@{branch}"
-            )
-        raise GitHubAPIError(f"GitHub API error: {e}")
-    except requests.exceptions.RequestException as e:
-        raise GitHubAPIError(f"Network error: {e}")
+    cache_path = _github_cache_path(owner, repo, branch)
+    cached = _read_github_cache(cache_path) if use_cache else None
+
+    if cached is not None and time.time() - cached.get("mtime", 0) < GITHUB_CACHE_TTL:
+        return _build_github_tree(cached["body"].get("tree", []), config)
 
-    tree = resp.json().get("tree", [])
-    root: Dict = {}
+    headers = {}
+    if cached is not None and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    with _github_session() as session:
+        resp = _github_get(
+            session, f"{trees_url}/{branch}?recursive=1", repo_name, branch, headers
+        )
+
+        if resp.status_code == 304 and cached is not None:
+            resp.close()
+            body = cached["body"]
+            etag = cached.get("etag")
+            root = _build_github_tree(body.get("tree", []), config)
+        else:
+            etag = resp.headers.get("ETag")
+
+            # Build the tree while the response is still being received
+            with _open_body(resp) as stream:
+                entries = _TreeEntries(stream, keep=use_cache)
+                root = _build_github_tree(entries, config)
+            body = {"tree": entries.kept}
+
+            # GitHub caps recursive listings; fetch the rest piece by piece
+            if entries.truncated:
+                tree, complete = _fetch_truncated_tree(
+                    session, trees_url, repo_name, branch
+                )
+                root = _build_github_tree(tree, config)
+                body = {"tree": tree}
+
+                # A tree with missing subtrees must not be served from the
+                # cache or revalidated as if it were whole
+                if not complete:
+                    return root
+
+    if use_cache:
+        _write_github_cache(cache_path, etag, body)
+
+    return root
+
+
+def _build_github_tree(tree: Iterable[Dict], config: TreesonConfig) -> Dict:
+    """Build a directory structure from GitHub tree entries."""
+    legacy = config.legacy_schema
+    root: Dict = {} if legacy else _new_node(legacy)
+    should_ignore = config._memoized_should_ignore()
+    intern = sys.intern
+
+    # The API lists entries in sorted order, so consecutive entries usually
+    # share most of their parent path. stack holds the directory dict for
+    # each component of the previous kept entry's parent path, and only the
+    # components that differ are checked and navigated. Names are interned
+    # like in _list_dir, so repeated names share one string.
+    prev_parts: List[str] = []
+    stack: List[Dict] = [root]
 
     for node in tree:
         path_parts = node["path"].split("/")
+        final_part = intern(path_parts.pop())
+
+        common = 0
+        limit = min(len(prev_parts), len(path_parts))
+        while common < limit and prev_parts[common] == path_parts[common]:
+            common += 1
+        new_parts = path_parts[common:]
 
         # Check if any part should be ignored
-        if any(config.should_ignore(part) for part in path_parts):
+        if should_ignore(final_part) or any(should_ignore(part) for part in new_parts):
             continue
 
-        current = root
-
         # Navigate/create directory structure
-        for part in path_parts[:-1]:
-            if part not in current:
-                current[part] = {"files": []}
-            current = current[part]
+        del stack[common + 1:]
+        current = stack[-1]
+        for part in new_parts:
+            children = current if legacy else current["dirs"]
+            current = children.setdefault(intern(part), _new_node(legacy))
+            stack.append(current)
+        prev_parts = path_parts
 
         # Add file or directory
-        final_part = path_parts[-1]
         if node["type"] == "blob":
-            if "files" not in current:
-                current["files"] = []
-            current["files"].append(final_part)
+            current.setdefault("files", []).append(final_part)
         elif node["type"] == "tree":
-            if final_part not in current:
-                current[final_part] = {"files": []}
+            children = current if legacy else current["dirs"]
+            children.setdefault(final_part, _new_node(legacy))
 
     return root
 
 
+def _encode_json(data: Dict, compact: bool) -> bytes:
+    """Serialize a tree to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        option = 0 if compact else orjson.OPT_INDENT_2
+        return cast(bytes, orjson.dumps(data, option=option))
+
+    if compact:
+        output = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    else:
+        output = json.dumps(data, indent=2, ensure_ascii=False)
+    return output.encode("utf-8")
+
+
+def _write_stdout(data: bytes) -> None:
+    """
+    Write UTF-8 bytes and a newline to stdout.
+
+    The bytes go straight to the binary buffer in one write instead of being
+    decoded and re-encoded by the text layer.
+    """
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        # stdout was replaced by a text-only stream
+        print(data.decode("utf-8"))
+        return
+
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.write(b"\n")
+    buffer.flush()
+
+
+@contextmanager
+def _replace_on_success(path: Path) -> Iterator[Path]:
+    """
+    Yield a temporary path next to path and move it over path on success.
+
+    Streamed output is written while the tree is still being walked, so
+    writing it to path directly would truncate an existing file before a
+    failure and leave half a document behind after one. The temporary file
+    is hidden and removed again if the block raises.
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=".treeson-", suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    tmp_path = Path(tmp_name)
+    try:
+        # mkstemp creates the file private; give it the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure argument parser."""
     parser = argparse.ArgumentParser(
@@ -244,6 +951,12 @@ Examples:
         help="GitHub branch name (default: main)"
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch GitHub trees from the API, bypassing the local cache"
+    )
+
     parser.add_argument(
         "--include-hidden",
         action="store_true",
@@ -257,6 +970,24 @@ Examples:
         help="Maximum directory depth to traverse"
     )
 
+    parser.add_argument(
+        "--no-sort",
+        action="store_true",
+        help="List entries in filesystem order instead of sorting them by name"
+    )
+
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Write one JSON object per directory and line (local directories only)"
+    )
+
+    parser.add_argument(
+        "--legacy-schema",
+        action="store_true",
+        help="Put subdirectories next to \"files\" instead of under \"dirs\""
+    )
+
     parser.add_argument(
         "--output", "-o",
         metavar="FILE",
@@ -272,7 +1003,7 @@ Examples:
     parser.add_argument(
         "--version",
         action="version",
-        version="%(prog)s 1.0.0"
+        version=f"%(prog)s {__version__}"
     )
 
     return parser
@@ -288,32 +1019,84 @@ def main() -> int:
     parser = create_parser()
     args = parser.parse_args()
 
+    is_url = args.target.startswith(("http://", "https://"))
+    if args.ndjson and is_url:
+        parser.error("--ndjson is only supported for local directories")
+
     # Build configuration
     config = TreesonConfig(
         ignores=DEFAULT_IGNORES.union(args.ignore),
         include_hidden=args.include_hidden,
-        max_depth=args.max_depth
+        max_depth=args.max_depth,
+        sort=not args.no_sort,
+        legacy_schema=args.legacy_schema
     )
 
     try:
         # Determine if target is URL or path
-        if args.target.startswith(("http://", "https://")):
-            data = github_repo_to_json(args.target, config, args.branch)
+        if is_url:
+            data = github_repo_to_json(
+                args.target, config, args.branch, use_cache=not args.no_cache
+            )
         else:
-            target_path = Path(args.target).resolve()
+            # The walkers only join names onto this path, so symlinks need no
+            # resolving. Joining onto the CWD keeps messages absolute without
+            # normalising "..", which the OS must apply after any symlink.
+            cwd = os.getcwd()
+            target_path = (
+                cwd if args.target == "." else os.path.join(cwd, args.target)
+            )
+
+            if args.ndjson:
+                if args.output:
+                    output_path = Path(args.output)
+                    _check_directory(target_path)
+                    with _replace_on_success(output_path) as tmp_path:
+                        stream_config = replace(
+                            config, ignores=config.ignores | {tmp_path.name}
+                        )
+                        with tmp_path.open("wb") as fp:
+                            dir_to_ndjson(target_path, stream_config, fp)
+                    print(f"Output written to: {output_path}", file=sys.stderr)
+                else:
+                    buffer = getattr(sys.stdout, "buffer", None)
+                    if buffer is None:
+                        # stdout was replaced by a text-only stream
+                        lines = io.BytesIO()
+                        dir_to_ndjson(target_path, config, lines)
+                        sys.stdout.write(lines.getvalue().decode("utf-8"))
+                    else:
+                        sys.stdout.flush()
+                        dir_to_ndjson(target_path, config, buffer)
+                        buffer.flush()
+                return 0
+
+            # Compact output to a file can be streamed without building the tree
+            if args.output and args.compact:
+                output_path = Path(args.output)
+                _check_directory(target_path)
+                with _replace_on_success(output_path) as tmp_path:
+                    # The file being written may sit inside the walked tree
+                    stream_config = replace(
+                        config, ignores=config.ignores | {tmp_path.name}
+                    )
+                    with tmp_path.open("w", encoding="utf-8") as fp:
+                        dir_to_json_stream(target_path, stream_config, fp)
+                print(f"Output written to: {output_path}", file=sys.stderr)
+                return 0
+
             data = dir_to_json(target_path, config)
 
         # Format JSON output
-        indent = None if args.compact else 2
-        output = json.dumps(data, indent=indent, ensure_ascii=False)
+        output = _encode_json(data, args.compact)
 
         # Write output
         if args.output:
             output_path = Path(args.output)
-            output_path.write_text(output, encoding="utf-8")
+            output_path.write_bytes(output)
             print(f"Output written to: {output_path}", file=sys.stderr)
         else:
-            print(output)
+            _write_stdout(output)
 
         return 0
 